@@ -0,0 +1,69 @@
+import os
+import tempfile
+import time
+
+import frigatenotify
+
+# Synthetic door sensor bursts fed through the door debounce stage.
+# Prints how many messages became silence triggers and how many database writes they cost.
+
+DEBOUNCE = 1  # Seconds, kept short so the bursts run quickly
+
+SCENARIOS = [
+    # (name, topic, camera, [(payload, delay before next message in seconds), ...])
+    ("chattering contact", "test/door/chatter", "Front", [("ON", 0.02), ("OFF", 0.02)] * 20),
+    ("republished ON state", "test/door/republish", "Back", [("ON", 0.02)] * 20),
+    ("two separate openings", "test/door/reopen", "Garage", [("ON", 0.1), ("OFF", DEBOUNCE + 0.1), ("ON", 0.1), ("OFF", 0)]),
+]
+
+def build_config(db_path):
+    return {
+        'mqtt': {'topic': 'frigate/events'},
+        'pushover': {},
+        'frigate_server': {'host': 'http://localhost:5000'},
+        'web_server': {'url': 'http://localhost:5050'},
+        'cooldown_period': 60,
+        'log_info': {'level': 'WARNING', 'log_file': '', 'log_to_screen': True},
+        'healthchecks': {},
+        'database': db_path,
+        'cameras': [camera for _, _, camera, _ in SCENARIOS],
+        'door_settings': {
+            'silence_period': 2,
+            'no_detection_timeout': 2,
+            'debounce': DEBOUNCE,
+            'flush_interval': 5,
+            'doors': [{'topic': topic, 'door': name, 'camera': camera} for name, topic, camera, _ in SCENARIOS],
+        },
+    }
+
+def run_burst(topic, messages):
+    triggers = 0
+    for payload, delay in messages:
+        before = frigatenotify.door_states.get(topic, {}).get("triggered")
+        frigatenotify.process_door_event(payload, topic)
+        triggers += frigatenotify.door_states[topic]["triggered"] != before
+        time.sleep(delay)
+    return triggers
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        frigatenotify.configure(build_config(os.path.join(tmp, 'silence_settings.db')))
+        frigatenotify.initialize_db(frigatenotify.silence_db)
+
+        writes = []
+        write_silence = frigatenotify.set_silence_settings
+        def counting_write(camera_id, silence_until):
+            writes.append(camera_id)
+            write_silence(camera_id, silence_until)
+        frigatenotify.set_silence_settings = counting_write
+
+        print(f"{'Scenario':<24}{'Messages':>10}{'Triggers':>10}{'DB writes':>11}")
+        for name, topic, camera, messages in SCENARIOS:
+            triggers = run_burst(topic, messages)
+            frigatenotify.flush_pending_silences()
+            silenced = frigatenotify.get_silence_until(camera)
+            print(f"{name:<24}{len(messages):>10}{triggers:>10}{writes.count(camera):>11}"
+                  f"  (silenced until {silenced:%H:%M:%S})")
+
+if __name__ == "__main__":
+    main()
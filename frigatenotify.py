@@ -1,11 +1,19 @@
 import atexit
 import datetime
+import functools
+import gzip
+import itertools
 import json
 import logging
+import logging.handlers
 import os
+import queue
 import random
 import re
-import requests
+import shutil
+import signal
+import socket
+import sys
 import threading
 import sched
 import sqlite3
@@ -13,9 +21,18 @@ import time
 import yaml
 from enum import Enum
 
-import paho.mqtt.client as mqtt
-from flask import Flask, request, jsonify, render_template, Response, redirect, url_for
-from requests.exceptions import HTTPError, Timeout, ConnectionError
+# Flask, paho-mqtt and requests are imported where they are used so the
+# configuration, policy and silence logic can be imported without them.
+
+startup_started = time.monotonic()  # Reference point for startup phase timings
+
+PUSHOVER_API_URL = "https://api.pushover.net/1/messages.json"
+
+# Settings an alert policy rule can override
+POLICY_SETTINGS = ('cooldown', 'min_score', 'min_area', 'rate_limit', 'quiet_hours')
+
+# (camera, label, zone) specificity masks, least specific first; camera rules beat label rules beat zone rules
+POLICY_MATCH_ORDER = sorted(itertools.product((False, True), repeat=3), key=lambda mask: (sum(mask), mask))
 
 # MQTT Connection States
 class MQTTConnectionState(Enum):
@@ -26,6 +43,9 @@ class MQTTConnectionState(Enum):
     FAILED = "failed"
 
 def exit_handler():
+    flush_pending_silences()
+    if ha_enabled and is_leader():
+        release_leader_lease()
     logger.info("Frigate Notify is exiting.")
 
 def cleanup_old_processed_events():
@@ -54,6 +74,7 @@ def cleanup_old_processed_events():
             logger.error(f"Error in cleanup_old_processed_events: {e}")
 
 def send_healthcheck_ping():
+    import requests
     global last_ping_time
     current_time = datetime.datetime.now()
     if last_ping_time is None or (current_time - last_ping_time) >= datetime.timedelta(hours=1):
@@ -70,6 +91,8 @@ def send_pushover_notification(
     token, user, message,
     ttl=None, attachment=None, html=None, sound=None,
     timestamp=None, title=None, url=None, url_title=None, **kwargs):
+    import requests
+    global last_pushover_success
 
     payload = {
         "token": token,
@@ -93,8 +116,10 @@ def send_pushover_notification(
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            response = requests.post("https://api.pushover.net/1/messages.json", data=payload, files=files, timeout=15)
+            response = requests.post(pushover_config.get('api_url', PUSHOVER_API_URL), data=payload, files=files, timeout=15)
             response.raise_for_status()  # Raise exception for HTTP errors
+            with health_lock:
+                last_pushover_success = time.time()
             return response.json()
         except requests.exceptions.RequestException as e:
             if attempt < max_retries - 1:
@@ -105,6 +130,55 @@ def send_pushover_notification(
                 logger.error(f"Pushover notification failed after {max_retries} attempts: {e}. Message: {message}")
                 return {"status": 0, "error": str(e)}
 
+def submit_outbound(task, *args):
+    """Queue network I/O for the outbound worker so the MQTT loop thread never blocks on it"""
+    task_id = object()
+    with health_lock:
+        outbound_pending[task_id] = time.monotonic()
+    outbound_queue.put((task_id, task, args))
+
+def process_outbound_queue():
+    """Run queued outbound tasks (healthcheck pings, notifications) one at a time"""
+    while True:
+        task_id, task, args = outbound_queue.get()
+        try:
+            task(*args)
+        except Exception as e:
+            logger.error(f"Error in outbound task {task.__name__}: {e}")
+        finally:
+            with health_lock:
+                del outbound_pending[task_id]
+
+def send_event_notification(event_id, label, camera, timestamp, event_data):
+    """Download the event thumbnail and send the Pushover alert"""
+    import requests
+
+    thumbnail_data = None
+    thumbnail_url = f"{frigate_server}/api/events/{event_id}/thumbnail.jpg"
+    try:
+        thumbnail_response = requests.get(thumbnail_url, timeout=10)
+        thumbnail_response.raise_for_status()  # Raise HTTPError for bad responses (4xx and 5xx)
+        thumbnail_data = thumbnail_response.content
+    except requests.exceptions.HTTPError as e:
+        logger.error(f"Failed to download snapshot. HTTP Error: {e}")
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to download snapshot due to network error: {e}")
+
+    logger.info(f"Sending notification for {label} on {camera} camera.")
+    logger.debug("Event Data: %s", event_data)
+    message = f"{label} detected on {camera} camera at {timestamp}."
+    send_pushover_notification(
+        token=pushover_config['api_key'],
+        user=pushover_config['user_key'],
+        message=message,
+        url=f"{web_server}/event/{event_id}",
+        attachment=thumbnail_data,
+        title=f"{camera} camera alert.",
+        ttl=172800,
+        url_title="View Snapshot and Clip",
+        sound="gamelan"
+    )
+
 def validate_config(config):
     errors = []
 
@@ -129,6 +203,8 @@ def validate_config(config):
         errors.append("Pushover api_key should be a string.")
     if not isinstance(pushover.get('user_key'), str):
         errors.append("Pushover user_key should be a string.")
+    if 'api_url' in pushover and not re.match(r'https?://[^\s]+', str(pushover['api_url'])):
+        errors.append("Pushover api_url should be a valid URL.")
     
     # Validate Healthchecks section
     healthchecks = config.get('healthchecks', {})
@@ -153,10 +229,58 @@ def validate_config(config):
         errors.append("Log file should be a valid file path.")
     if not isinstance(log_info.get('log_to_screen'), bool):
         errors.append("'log_to_screen' should be a boolean value (True/False).")
+    if log_info.get('format', 'text') not in ('text', 'json'):
+        errors.append("Logging format should be 'text' or 'json'.")
+    rotation = log_info.get('rotation', {})
+    if not isinstance(rotation, dict):
+        errors.append("Logging rotation should be a mapping.")
+    else:
+        if not isinstance(rotation.get('max_bytes', 0), int) or rotation.get('max_bytes', 0) < 0:
+            errors.append("Logging rotation max_bytes should be a non-negative integer.")
+        if rotation.get('when') and rotation.get('max_bytes'):
+            errors.append("Logging rotation should set either max_bytes or when, not both.")
+        if rotation.get('when') and str(rotation['when']).upper() not in ('S', 'M', 'H', 'D', 'MIDNIGHT') + tuple(f'W{day}' for day in range(7)):
+            errors.append("Logging rotation when should be S, M, H, D, midnight or W0-W6.")
+        if not isinstance(rotation.get('backup_count', 5), int) or rotation.get('backup_count', 5) < 0:
+            errors.append("Logging rotation backup_count should be a non-negative integer.")
+        if not isinstance(rotation.get('compress', True), bool):
+            errors.append("Logging rotation compress should be a boolean value (True/False).")
+    for name, level in (log_info.get('loggers') or {}).items():
+        if level not in ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']:
+            errors.append(f"Logging level for logger '{name}' should be a valid Python logging level.")
 
     #Validate other fields
     if not isinstance(config.get('cooldown_period'), int):
         errors.append("Cooldown period should be an integer.")
+
+    # Validate High Availability section (optional)
+    high_availability = config.get('high_availability', {})
+    if not isinstance(high_availability.get('enabled', False), bool):
+        errors.append("High availability 'enabled' should be a boolean value (True/False).")
+    for key in ('lease_topic', 'state_topic'):
+        if key in high_availability and not re.match(r'^[\w/]+$', str(high_availability[key])):
+            errors.append(f"High availability {key} should be formatted as an MQTT topic.")
+    lease_duration = high_availability.get('lease_duration', 10)
+    renew_interval = high_availability.get('renew_interval', 2)
+    if not isinstance(lease_duration, int) or lease_duration <= 0:
+        errors.append("High availability lease_duration should be a positive integer.")
+    elif not isinstance(renew_interval, int) or not 0 < renew_interval < lease_duration:
+        errors.append("High availability renew_interval should be a positive integer smaller than lease_duration.")
+    # Validate door debounce settings (optional)
+    door_settings = config.get('door_settings', {})
+    if 'debounce' in door_settings and (not isinstance(door_settings['debounce'], (int, float)) or door_settings['debounce'] < 0):
+        errors.append("Door settings debounce should be a non-negative number (seconds).")
+    if 'flush_interval' in door_settings and (not isinstance(door_settings['flush_interval'], (int, float)) or door_settings['flush_interval'] <= 0):
+        errors.append("Door settings flush_interval should be a positive number (seconds).")
+
+    # Validate Health section (optional)
+    health = config.get('health', {})
+    for key in ('max_message_age', 'max_notification_age', 'max_handler_time'):
+        if key in health and (not isinstance(health[key], int) or health[key] < 0):
+            errors.append(f"Health {key} should be a non-negative integer (seconds).")
+
+    for rule in config.get('alert_policies') or []:
+        errors.extend(validate_alert_policy(rule))
     if config.get('database') and not re.match(r'^[\w\-/.]+$', config.get('database')):
         errors.append("Database file should be a valid file path.")
 
@@ -168,6 +292,34 @@ def validate_config(config):
     else:
         return True
     
+def validate_alert_policy(rule):
+    """Return a list of configuration errors for one alert policy rule"""
+    if not isinstance(rule, dict):
+        return ["Alert policy rules should be mappings."]
+
+    errors = []
+    unknown = set(rule) - {'camera', 'label', 'zone'} - set(POLICY_SETTINGS)
+    if unknown:
+        errors.append(f"Alert policy has unknown settings: {', '.join(sorted(unknown))}.")
+    if 'cooldown' in rule and (not isinstance(rule['cooldown'], int) or rule['cooldown'] < 0):
+        errors.append("Alert policy cooldown should be a non-negative integer.")
+    if 'min_score' in rule and not (isinstance(rule['min_score'], (int, float)) and 0 <= rule['min_score'] <= 1):
+        errors.append("Alert policy min_score should be a number between 0 and 1.")
+    if 'min_area' in rule and (not isinstance(rule['min_area'], int) or rule['min_area'] < 0):
+        errors.append("Alert policy min_area should be a non-negative integer.")
+    if 'rate_limit' in rule:
+        rate_limit = rule['rate_limit']
+        if not (isinstance(rate_limit, dict)
+                and isinstance(rate_limit.get('count'), int) and rate_limit['count'] > 0
+                and isinstance(rate_limit.get('per'), int) and rate_limit['per'] > 0):
+            errors.append("Alert policy rate_limit should have positive integer 'count' and 'per' (seconds).")
+    if 'quiet_hours' in rule:
+        quiet_hours = rule['quiet_hours']
+        if not (isinstance(quiet_hours, dict)
+                and all(re.match(r'^([01]\d|2[0-3]):[0-5]\d$', str(quiet_hours.get(edge, ''))) for edge in ('start', 'end'))):
+            errors.append("Alert policy quiet_hours should have 'start' and 'end' as HH:MM.")
+    return errors
+
 def load_config(config_file='/config/config.yaml'):
     try:
         with open(config_file, 'r') as f:
@@ -209,6 +361,92 @@ def load_config(config_file='/config/config.yaml'):
         print(f"Error in configuration file: {e}")
         exit(1)
 
+def compile_alert_policies(policies):
+    """Compile alert policy rules into a lookup keyed by (camera, label, zone).
+
+    Missing camera/label/zone fields match anything ("*"). Rules with the same
+    key are merged. Returns the lookup and the set of zones that have rules.
+    """
+    compiled = {}
+    for rule in policies or []:
+        key = tuple(str(rule.get(field, '*')).lower() for field in ('camera', 'label', 'zone'))
+        settings = {name: rule[name] for name in POLICY_SETTINGS if name in rule}
+        if 'quiet_hours' in settings:
+            settings['quiet_hours'] = tuple(
+                datetime.datetime.strptime(settings['quiet_hours'][edge], '%H:%M').time()
+                for edge in ('start', 'end')
+            )
+        compiled.setdefault(key, {}).update(settings)
+    zones = {key[2] for key in compiled if key[2] != '*'}
+    return compiled, zones
+
+def select_policy_zone(entered_zones):
+    """Return the first entered zone that has policy rules, or "*" """
+    return next((zone.lower() for zone in entered_zones if zone.lower() in policy_zones), '*')
+
+@functools.lru_cache(maxsize=1024)
+def resolve_alert_policy(camera, label, zone):
+    """Merge every rule matching (camera, label, zone), least specific first.
+
+    At most eight lookups regardless of the number of rules, and the result is
+    cached per combination. The returned dict is shared and must not be modified.
+    """
+    policy = {'cooldown': cooldown_period}
+    for mask in POLICY_MATCH_ORDER:
+        key = tuple(value if specific else '*' for value, specific in zip((camera, label, zone), mask))
+        policy.update(alert_policies.get(key, {}))
+    return policy
+
+def check_alert_policy(policy, event_data, current_time):
+    """Return the reason an event is rejected by its policy thresholds, or None"""
+    min_score = policy.get('min_score')
+    if min_score is not None:
+        score = event_data.get('top_score') or event_data.get('score') or 0
+        if score < min_score:
+            return f"score {score:.2f} below {min_score}"
+
+    min_area = policy.get('min_area')
+    if min_area is not None:
+        area = event_data.get('area') or 0
+        if area < min_area:
+            return f"area {area} below {min_area}"
+
+    quiet_hours = policy.get('quiet_hours')
+    if quiet_hours:
+        start, end = quiet_hours
+        now = current_time.time()
+        if (start <= now < end) if start <= end else (now >= start or now < end):
+            return "quiet hours"
+
+    return None
+
+def consume_rate_limit_token(bucket_key, policy):
+    """Take a token from the bucket for bucket_key, return False if it is empty"""
+    rate_limit = policy.get('rate_limit')
+    if not rate_limit:
+        return True
+
+    capacity = rate_limit['count']
+    refill_per_second = capacity / rate_limit['per']
+    now = time.monotonic()
+    with rate_limit_lock:
+        tokens, updated = rate_limit_buckets.get(bucket_key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+        allowed = tokens >= 1
+        rate_limit_buckets[bucket_key] = (tokens - 1 if allowed else tokens, now)
+    return allowed
+
+def get_rate_limit_tokens(bucket_key):
+    """Return the tokens left in the bucket for bucket_key, or None if it has no bucket"""
+    with rate_limit_lock:
+        bucket = rate_limit_buckets.get(bucket_key)
+    return bucket[0] if bucket else None
+
+def set_rate_limit_tokens(bucket_key, tokens):
+    """Adopt the token count shared by the leader, refilling from now"""
+    with rate_limit_lock:
+        rate_limit_buckets[bucket_key] = (tokens, time.monotonic())
+
 def initialize_db(db_name):
     if not os.path.exists(db_name):
         conn = sqlite3.connect(db_name, check_same_thread=False)
@@ -232,7 +470,7 @@ def get_silence_settings(camera_id=None):
         else:
             c.execute('SELECT * FROM silence_settings WHERE silence_until > ?', (now,))
         settings = c.fetchall()
-        return settings
+        return overlay_pending_silences(settings, camera_id, now)
     except Exception as e:
         logger.error(f"Database error in get_silence_settings: {e}")
         return []
@@ -240,43 +478,105 @@ def get_silence_settings(camera_id=None):
         conn.close()
 
 def set_silence_settings(camera_id, silence_until):
-    conn = None
-    try:
-        conn = sqlite3.connect(silence_db, check_same_thread=False)
-        c = conn.cursor()
-        query = '''
-            INSERT OR REPLACE INTO silence_settings
-            (camera_id, silence_until)
-            VALUES (?, ?)
-        '''
-        params = (camera_id, silence_until)
-        c.execute(query, params)
-        conn.commit()
-    except Exception as e:
-        logger.error(f"Database error in set_silence_settings: {e}")
-        if conn:
-            conn.rollback()
-    finally:
-        if conn:
-            conn.close()
+    with silence_lock:
+        pending_silences.pop(camera_id, None)  # This write supersedes any unflushed door silence
+        conn = None
+        try:
+            conn = sqlite3.connect(silence_db, check_same_thread=False)
+            c = conn.cursor()
+            query = '''
+                INSERT OR REPLACE INTO silence_settings
+                (camera_id, silence_until)
+                VALUES (?, ?)
+            '''
+            params = (camera_id, silence_until)
+            c.execute(query, params)
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Database error in set_silence_settings: {e}")
+            if conn:
+                conn.rollback()
+        finally:
+            if conn:
+                conn.close()
 
 def clear_silence_settings(camera_id=None):
-    conn = None
-    try:
-        conn = sqlite3.connect(silence_db, check_same_thread=False)
-        c = conn.cursor()
+    with silence_lock:
         if camera_id:
-            c.execute('DELETE FROM silence_settings WHERE camera_id = ?', (camera_id,))
+            pending_silences.pop(camera_id, None)
         else:
-            c.execute('DELETE FROM silence_settings')
-        conn.commit()
-    except Exception as e:
-        logger.error(f"Database error in clear_silence_settings: {e}")
-        if conn:
-            conn.rollback()
-    finally:
-        if conn:
-            conn.close()
+            pending_silences.clear()
+        conn = None
+        try:
+            conn = sqlite3.connect(silence_db, check_same_thread=False)
+            c = conn.cursor()
+            if camera_id:
+                c.execute('DELETE FROM silence_settings WHERE camera_id = ?', (camera_id,))
+            else:
+                c.execute('DELETE FROM silence_settings')
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Database error in clear_silence_settings: {e}")
+            if conn:
+                conn.rollback()
+        finally:
+            if conn:
+                conn.close()
+
+def queue_silence(camera_id, silence_until):
+    """Record a door silence in memory; flush_pending_silences() writes it to the database"""
+    with silence_lock:
+        pending_silences[camera_id] = silence_until
+
+def extend_pending_silence(camera_id, silence_until):
+    """Push out an unflushed silence for camera_id, return the new end or None if there is none"""
+    with silence_lock:
+        pending = pending_silences.get(camera_id)
+        if pending is None:
+            return None
+        pending_silences[camera_id] = max(pending, silence_until)
+        return pending_silences[camera_id]
+
+def get_silence_until(camera_id):
+    """Return the active silence end for camera_id, checking unflushed silences before the database"""
+    with silence_lock:
+        pending = pending_silences.get(camera_id)
+    if pending and pending > datetime.datetime.now():
+        return pending
+
+    silence_settings = get_silence_settings(camera_id)
+    if not silence_settings:
+        return None
+    # silence_settings is a list of (camera_id, silence_until) tuples
+    return datetime.datetime.fromisoformat(silence_settings[0][1])
+
+def overlay_pending_silences(settings, camera_id, now):
+    """Merge unflushed silences over the (camera_id, silence_until) rows read from the database"""
+    with silence_lock:
+        pending = {
+            camera: until for camera, until in pending_silences.items()
+            if until > now and camera_id in (None, camera)
+        }
+    if not pending:
+        return settings
+    merged = dict(settings)
+    merged.update((camera, until.isoformat(" ")) for camera, until in pending.items())
+    return list(merged.items())
+
+def flush_pending_silences():
+    """Write unflushed door silences to the database"""
+    with silence_lock:
+        for camera_id, silence_until in list(pending_silences.items()):
+            set_silence_settings(camera_id, silence_until)
+
+def flush_silences_periodically():
+    """Periodically flush door silences so bursts of door events cost one database write"""
+    while True:
+        try:
+            time.sleep(silence_flush_interval)
+            flush_pending_silences()
+        except Exception as e:
+            logger.error(f"Error in flush_silences_periodically: {e}")
 
 def validate_camera_id(camera_id):
     """Validate that camera_id is in the configured cameras list"""
@@ -296,8 +596,212 @@ def validate_duration(duration_str):
     except (ValueError, TypeError):
         return False
 
+def is_leader():
+    """Return True if this instance holds the notifier lease and its last renewal is still within the lease"""
+    if not ha_enabled:
+        return True
+    with ha_lock:
+        return lease_holder == instance_id and (time.time() - lease_sent) <= ha_lease_duration
+
+def publish_leader_lease(state="held", term=None):
+    """Publish a lease claim/renewal (or release) for this instance, stamped with the term and send time"""
+    client = mqtt_client
+    if client is None:
+        return None
+    with ha_lock:
+        term = lease_term if term is None else term
+    payload = json.dumps({"instance": instance_id, "state": state, "term": term, "sent": time.time()})
+    return client.publish(ha_lease_topic, payload, qos=1)
+
+def release_leader_lease():
+    """Hand the lease back on shutdown so a standby can take over immediately"""
+    try:
+        info = publish_leader_lease(state="released")
+        if info is not None:
+            info.wait_for_publish(timeout=2)
+            mqtt_client.disconnect()  # Graceful disconnect, the will is not sent
+        logger.info(f"Released leader lease held by {instance_id}")
+    except Exception as e:
+        logger.error(f"Error releasing leader lease: {e}")
+
+def reset_leader_lease():
+    """Forget the current holder and observe the lease topic for a full lease period before claiming"""
+    global lease_holder, lease_observe_until
+    with ha_lock:
+        lease_holder = None
+        lease_observe_until = time.monotonic() + ha_lease_duration
+
+def process_lease_message(payload):
+    """Apply a lease message.
+
+    Every instance sees lease messages in the same order from the broker, and
+    the rule below only uses values carried in the messages (term, holder and
+    the publisher's send time), so every instance reaches the same holder no
+    matter when it processes them:
+    - a renewal must come from the holder for the current term;
+    - a claim must carry a higher term and be sent more than lease_duration
+      after the holder's last renewal (or after a release).
+    While observing after (re)connecting, the latest held message is trusted.
+    Expiry compares send times from different hosts, so clocks must be
+    synchronized (NTP) well within lease_duration.
+    """
+    global lease_holder, lease_term, lease_sent
+    try:
+        data = json.loads(payload)
+        claimant = data['instance']
+        state = data.get('state', 'held')
+        term = data.get('term')
+        sent = float(data['sent']) if state != "released" else None
+        if state != "released" and not isinstance(term, int):
+            raise ValueError("lease term should be an integer")
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring malformed lease message: {e}")
+        return
+
+    with ha_lock:
+        previous_holder = lease_holder
+        if state == "released":
+            # The will message carries no term; it can only come from a disconnected instance
+            if lease_holder == claimant and term in (None, lease_term):
+                lease_holder = None
+        elif time.monotonic() < lease_observe_until:
+            if term >= lease_term:
+                lease_holder, lease_term, lease_sent = claimant, term, sent
+        elif term == lease_term and claimant == lease_holder:
+            lease_sent = max(lease_sent, sent)
+        elif term > lease_term and (lease_holder is None or sent - lease_sent > ha_lease_duration):
+            lease_holder, lease_term, lease_sent = claimant, term, sent
+        current_holder = lease_holder
+
+    if claimant == instance_id and state != "released" and time.time() - sent > ha_lease_duration:
+        logger.warning(f"Lease message from {instance_id} arrived {time.time() - sent:.1f}s after it was sent, stepping down.")
+
+    if current_holder != previous_holder:
+        if current_holder == instance_id:
+            logger.info(f"Instance {instance_id} acquired the leader lease (term {term}) and will send notifications.")
+        elif previous_holder == instance_id:
+            logger.warning(f"Instance {instance_id} lost the leader lease to {current_holder}.")
+        else:
+            logger.info(f"Leader lease is now held by {current_holder}.")
+
+def maintain_leader_lease():
+    """Renew the lease while leader, claim it with the next term when it is vacant or expired"""
+    while True:
+        try:
+            time.sleep(ha_renew_interval)
+
+            with mqtt_state_lock:
+                connected = mqtt_connection_state == MQTTConnectionState.CONNECTED
+            if not connected:
+                continue
+
+            with ha_lock:
+                observing = time.monotonic() < lease_observe_until
+                vacant = lease_holder is None or (time.time() - lease_sent) > ha_lease_duration
+                next_term = lease_term + 1
+
+            if is_leader():
+                publish_leader_lease()
+            elif vacant and not observing:
+                publish_leader_lease(term=next_term)
+
+        except Exception as e:
+            logger.error(f"Error in maintain_leader_lease: {e}")
+
+def publish_ha_state(kind, **fields):
+    """Share a decision with the other instances so standbys keep the same dedup and silence state"""
+    if not ha_enabled or mqtt_client is None:
+        return
+    payload = {"instance": instance_id, "type": kind, **fields}
+    try:
+        mqtt_client.publish(ha_state_topic, json.dumps(payload), qos=1)
+    except Exception as e:
+        logger.error(f"Error publishing HA state: {e}")
+
+def publish_silence_state(camera_id, silence_until):
+    """Publish a camera's silence (None when cleared) as a retained message so instances that join later receive it"""
+    if not ha_enabled or mqtt_client is None:
+        return
+    payload = {"instance": instance_id, "until": silence_until.isoformat() if silence_until else None}
+    try:
+        mqtt_client.publish(f"{ha_state_topic}/silence/{camera_id}", json.dumps(payload), qos=1, retain=True)
+    except Exception as e:
+        logger.error(f"Error publishing silence state: {e}")
+
+def process_silence_message(camera_id, payload, retained):
+    """Apply a camera silence shared by another instance (or our own, when replayed by the broker on join)"""
+    try:
+        data = json.loads(payload)
+        if data.get('instance') == instance_id and not retained:
+            return  # Our own update, already applied locally
+        if data.get('until'):
+            # Held in memory like a local door silence, so chattering doors cost standbys one write per flush
+            queue_silence(camera_id, datetime.datetime.fromisoformat(data['until']))
+        else:
+            clear_silence_settings(camera_id)
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.warning(f"Ignoring malformed silence state message: {e}")
+
+def publish_state_snapshot():
+    """Send the leader's dedup, cooldown, detection and rate limit state for instances that just joined"""
+    with processed_events_lock:
+        events = {event_id: seen.timestamp() for event_id, seen in processed_events.items()}
+    with cooldown_lock:
+        cooldowns = {key: alerted.timestamp() for key, alerted in cooldown_dict.items()}
+    with detection_lock:
+        detections = {camera: detected.timestamp() for camera, detected in detection_dict.items()}
+    with rate_limit_lock:
+        tokens = {key: bucket[0] for key, bucket in rate_limit_buckets.items()}
+    publish_ha_state("snapshot", processed_events=events, cooldowns=cooldowns, detections=detections, tokens=tokens)
+
+def apply_state_snapshot(data):
+    """Merge a leader snapshot, keeping the newer timestamp for entries this instance already has"""
+    def merge(target, lock, entries):
+        with lock:
+            for key, seen in entries.items():
+                seen = datetime.datetime.fromtimestamp(seen)
+                if key not in target or target[key] < seen:
+                    target[key] = seen
+
+    merge(processed_events, processed_events_lock, data.get('processed_events', {}))
+    merge(cooldown_dict, cooldown_lock, data.get('cooldowns', {}))
+    merge(detection_dict, detection_lock, data.get('detections', {}))
+    for key, tokens in data.get('tokens', {}).items():
+        set_rate_limit_tokens(key, tokens)
+    logger.info(f"Applied state snapshot from {data.get('instance')} ({len(data.get('processed_events', {}))} events).")
+
+def process_state_message(payload):
+    """Apply dedup state shared by another instance"""
+    try:
+        data = json.loads(payload)
+        if data.get('instance') == instance_id:
+            return  # Our own update, already applied locally
+
+        kind = data.get('type')
+        if kind == "alert":
+            alert_time = datetime.datetime.fromtimestamp(data['time'])
+            with cooldown_lock:
+                cooldown_dict[data['camera_label']] = alert_time
+            with detection_lock:
+                detection_dict[data['camera']] = alert_time
+            with processed_events_lock:
+                processed_events[data['event_id']] = alert_time
+            if data.get('tokens') is not None:
+                set_rate_limit_tokens(data['camera_label'], data['tokens'])
+        elif kind == "hello":
+            if is_leader():
+                publish_state_snapshot()
+        elif kind == "snapshot":
+            if not is_leader():
+                apply_state_snapshot(data)
+        else:
+            logger.warning(f"Ignoring HA state message of unknown type: {kind}")
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring malformed HA state message: {e}")
+
 def connect_to_mqtt():
-    global mqtt_connection_state
+    import paho.mqtt.client as mqtt
+    global mqtt_connection_state, mqtt_client
     backoff_time = 1  # in seconds
     max_backoff_time = 60  # in seconds
     retry_count = 0
@@ -312,7 +816,7 @@ def connect_to_mqtt():
             # Use new callback API version 2 with stable client ID
             client = mqtt.Client(
                 callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
-                client_id="frigate-notify",  # Stable client ID
+                client_id=mqtt_client_id,    # Stable client ID (unique per instance in HA mode)
                 clean_session=True,          # Don't persist session state
                 protocol=mqtt.MQTTv311       # Use MQTT 3.1.1 protocol
             )
@@ -321,10 +825,15 @@ def connect_to_mqtt():
             client.on_disconnect = on_disconnect
 
             # Enable Paho logging
-            client.enable_logger(logger)
+            client.enable_logger()  # Logs to "paho.mqtt.client", level set via log_info.loggers
 
             client.username_pw_set(mqtt_config['username'], mqtt_config['password'])
 
+            # Release the lease if this instance drops off the broker without a clean shutdown
+            if ha_enabled:
+                client.will_set(ha_lease_topic, json.dumps({"instance": instance_id, "state": "released"}), qos=1)
+            mqtt_client = client
+
             # Increased keepalive to 120 seconds for better stability
             client.connect(mqtt_config['host'], mqtt_config['port'], keepalive=120)
 
@@ -335,15 +844,11 @@ def connect_to_mqtt():
             backoff_time = 1
             retry_count = 0
 
-            logger.info(f"MQTT connection established with client_id: frigate-notify")
+            logger.info(f"MQTT connection established with client_id: {mqtt_client_id}")
 
             # This blocks until disconnect
             client.loop_forever()
 
-        except (mqtt.ClientException, OSError) as e:
-            logger.error(f"MQTT Client Exception: {e}")
-            with mqtt_state_lock:
-                mqtt_connection_state = MQTTConnectionState.RECONNECTING
         except ConnectionRefusedError as e:
             logger.error(f"MQTT Connection Refused: {e}")
             with mqtt_state_lock:
@@ -352,6 +857,10 @@ def connect_to_mqtt():
             logger.error(f"MQTT Connection Timed Out: {e}")
             with mqtt_state_lock:
                 mqtt_connection_state = MQTTConnectionState.RECONNECTING
+        except OSError as e:
+            logger.error(f"MQTT Client Exception: {e}")
+            with mqtt_state_lock:
+                mqtt_connection_state = MQTTConnectionState.RECONNECTING
         except Exception as e:
             logger.exception(f"Unexpected MQTT error: {e}")
             with mqtt_state_lock:
@@ -376,6 +885,10 @@ def on_disconnect(client, userdata, disconnect_flags, reason_code, properties):
             mqtt_connection_state = MQTTConnectionState.DISCONNECTED
             logger.info("MQTT client disconnected gracefully.")
 
+    # Stop sending notifications until the lease is re-established
+    if ha_enabled:
+        reset_leader_lease()
+
 def on_connect(client, userdata, flags, reason_code, properties):
     """Callback for MQTT connection (API v2)"""
     global mqtt_connection_state
@@ -395,61 +908,113 @@ def on_connect(client, userdata, flags, reason_code, properties):
         topic = door['topic']
         client.subscribe(topic)
         logger.info(f"Subscribed to door topic: {topic} for {door['door']}")
+    record_startup_phase("first MQTT subscribe")
+
+    if ha_enabled:
+        reset_leader_lease()
+        client.subscribe(ha_lease_topic, qos=1)
+        client.subscribe(ha_state_topic, qos=1)
+        client.subscribe(f"{ha_state_topic}/silence/+", qos=1)  # Retained, replays every camera's silence
+        logger.info(f"Subscribed to HA topics: {ha_lease_topic}, {ha_state_topic} as instance {instance_id}")
+        publish_ha_state("hello")  # Ask the leader for its dedup state
 
 
 def on_message(client, userdata, msg):
+    global handler_started
+    with health_lock:
+        handler_started = time.monotonic()
+    try:
+        handle_message(msg)
+    finally:
+        with health_lock:
+            handler_started = None
+
+def handle_message(msg):
+    global last_message_time
     topic = msg.topic
-    
+
+    # High availability coordination topics
+    if ha_enabled and topic == ha_lease_topic:
+        process_lease_message(msg.payload)
+    elif ha_enabled and topic == ha_state_topic:
+        process_state_message(msg.payload)
+    elif ha_enabled and topic.startswith(f"{ha_state_topic}/silence/"):
+        process_silence_message(topic.rsplit('/', 1)[-1], msg.payload, msg.retain)
 
     # Check if the topic is the one specified in mqtt_config
-    if topic == mqtt_config['topic']:
+    elif topic == mqtt_config['topic']:
+        last_message_time = time.monotonic()  # Only Frigate and door traffic counts for health, not HA traffic
         process_camera_event(msg)
 
     # Check if the topic exists in the doors list
-    elif any(door['topic'] == topic for door in doors):
+    elif topic in doors_by_topic:
+        last_message_time = time.monotonic()
         payload = msg.payload.decode()
         process_door_event(payload, topic)
 
     else:
         logger.warning(f"Received message from unhandled topic: {topic}")
 
+def debounce_door_event(topic, payload, now=None):
+    """Classify a door sensor payload as "trigger", "coalesce" or None (ignore).
+
+    Only OFF->ON edges count, so republished ON states are ignored. An edge
+    within the debounce window of the last trigger on the same topic is
+    coalesced into that trigger instead of starting a new one.
+    """
+    now = time.monotonic() if now is None else now
+    with door_lock:
+        state = door_states.setdefault(topic, {"payload": None, "triggered": None})
+        previous_payload = state["payload"]
+        state["payload"] = payload
+
+        if payload != "ON" or previous_payload == "ON":
+            return None
+        if state["triggered"] is not None and now - state["triggered"] < door_debounce:
+            return "coalesce"
+        state["triggered"] = now
+        return "trigger"
+
 def process_door_event(payload, topic):
+    outcome = debounce_door_event(topic, payload)
+    if outcome is None:
+        return  # Not an OFF->ON edge
 
-    if payload != "ON":
-        return  # Exit the function early if the payload is not "ON"  
+    if not is_leader():
+        return  # The leader applies door silences and shares them with standbys
 
     # Look up the camera and door values based on the topic
-    door_entry = next((door for door in doors if door['topic'] == topic), None)
+    door_entry = doors_by_topic.get(topic)
     if door_entry is None:
         logger.warning(f"No door entry found for topic: {topic}")
         return
     
     camera = door_entry['camera']
     door_name = door_entry['door']
+    current_time = datetime.datetime.now()
+    silence_period = datetime.timedelta(minutes=config['door_settings']['silence_period'])
+
+    # Chatter within the debounce window only pushes out a silence this door already started
+    if outcome == "coalesce":
+        extended_until = extend_pending_silence(camera, current_time + silence_period)
+        if extended_until:
+            publish_silence_state(camera, extended_until)
+            logger.debug(f"Coalesced {door_name} chatter, {camera} silence extended in memory.")
+        return
 
-    # Get the silence settings for the desired camera
-    silence_settings = get_silence_settings(camera)
-
-    # If the silence settings were found for the desired camera
-    if silence_settings:
-        # Assume silence_settings is a list of tuples and get the first tuple
-        silence_until_tuple = silence_settings[0]
-
-        # Assume the silence_until value is the second element in the tuple
-        silence_until_str = silence_until_tuple[1]
-
-        # Convert silence_until to a datetime object
-        silence_until = datetime.datetime.strptime(silence_until_str, '%Y-%m-%d %H:%M:%S.%f')
+    # Get the silence until time for the desired camera
+    silence_until = get_silence_until(camera)
 
-        current_time = datetime.datetime.now()
+    # If a silence was found for the desired camera
+    if silence_until:
         remaining_silence_time = silence_until - current_time
-        silence_period = datetime.timedelta(minutes=config['door_settings']['silence_period'])
 
         if remaining_silence_time < silence_period:
             # If the remaining silence time is less than config['door_settings']['silence_period'],
             # reset the silence time to have at least that much time
             new_silence_until = current_time + silence_period
-            set_silence_settings(camera, new_silence_until)
+            queue_silence(camera, new_silence_until)
+            publish_silence_state(camera, new_silence_until)
             logger.info(f"{camera} was already silenced, extending time until {new_silence_until} because {door_name} was opened.")
         elif remaining_silence_time >= silence_period:
             # If the remaining silence time is longer than config['door_settings']['silence_period'],
@@ -466,8 +1031,9 @@ def process_door_event(payload, topic):
         return
 
     # Otherwise, silence the camera and update the detection_dict
-    silence_until = datetime.datetime.now() + datetime.timedelta(minutes=config['door_settings']['silence_period'])
-    set_silence_settings(camera, silence_until)
+    silence_until = datetime.datetime.now() + silence_period
+    queue_silence(camera, silence_until)
+    publish_silence_state(camera, silence_until)
     with detection_lock:
         detection_dict[camera] = datetime.datetime.now()
 
@@ -485,7 +1051,12 @@ def process_camera_event(msg):
     timestamp = datetime.datetime.now().strftime("%m/%d/%Y %I:%M:%S %p")
     
     current_time = datetime.datetime.now()
-    result = send_healthcheck_ping()
+
+    if event_type in ["new", "update"] and not is_leader():
+        logger.debug(f"Standby instance, leaving {label} on {camera} camera to the leader.")
+        return
+
+    submit_outbound(send_healthcheck_ping)
 
     # Check silence settings for the camera
     silence_settings = get_silence_settings(camera)
@@ -498,11 +1069,30 @@ def process_camera_event(msg):
 
         # If entered_zones is not empty, process the event
         if entered_zones:
+            policy_zone = select_policy_zone(entered_zones)
+            policy = resolve_alert_policy(event_data['camera'].lower(), event_data['label'].lower(), policy_zone)
             camera_label_combo = f"{event_data['camera']}_{event_data['label']}"
+            if policy_zone != "*":
+                camera_label_combo = f"{camera_label_combo}_{policy_zone}"
+
+            rejection = check_alert_policy(policy, event_data, current_time)
+            if rejection:
+                logger.info(f"Ignoring {label} on {camera} camera due to {rejection}.")
+                logger.debug("Event Data: %s", event_data)
+                return
+
             with cooldown_lock:
                 last_alert_time = cooldown_dict.get(camera_label_combo, None)
 
-            if (not last_alert_time) or (current_time - last_alert_time).total_seconds() >= cooldown_period:
+            if (not last_alert_time) or (current_time - last_alert_time).total_seconds() >= policy['cooldown']:
+                # Only a sent alert may restart the cooldown or mark the event processed
+                with processed_events_lock:
+                    event_seen = event_id in processed_events
+                if not event_seen and not consume_rate_limit_token(camera_label_combo, policy):
+                    logger.info(f"Ignoring {label} on {camera} camera due to rate limit.")
+                    logger.debug("Event Data: %s", event_data)
+                    return
+
                 with cooldown_lock:
                     cooldown_dict[camera_label_combo] = current_time  # Update the last alert time
                 with detection_lock:
@@ -514,127 +1104,308 @@ def process_camera_event(msg):
                         processed_events[event_id] = current_time  # Store with timestamp
 
                 if not event_already_processed:
-           
-                    thumbnail_url = f"{frigate_server}/api/events/{event_id}/thumbnail.jpg"
-                    try:
-                        thumbnail_response = requests.get(thumbnail_url, timeout=10)
-                        thumbnail_response.raise_for_status()  # Raise HTTPError for bad responses (4xx and 5xx)
-                        thumbnail_data = thumbnail_response.content
-                    except requests.exceptions.RequestException as e:
-                        logger.error(f"Failed to download snapshot due to network error: {e}")
-                    except requests.exceptions.HTTPError as e:
-                        logger.error(f"Failed to download snapshot. HTTP Error: {e}")
-
-                    logger.info(f"Sending notification for {label} on {camera} camera.")
-                    logger.debug(f"Event Data: {event_data}")
-                    message = f"{label} detected on {camera} camera at {timestamp}."
-                    response = send_pushover_notification(
-                        token=pushover_config['api_key'],
-                        user=pushover_config['user_key'],
-                        message=message,
-                        url=f"{web_server}/event/{event_id}",
-                        attachment=thumbnail_data,
-                        title=f"{camera} camera alert.",
-                        ttl=172800,
-                        url_title="View Snapshot and Clip",
-                        sound="gamelan"
+                    publish_ha_state(
+                        "alert", event_id=event_id, camera=camera,
+                        camera_label=camera_label_combo, time=current_time.timestamp(),
+                        tokens=get_rate_limit_tokens(camera_label_combo)
                     )
+                    submit_outbound(send_event_notification, event_id, label, camera, timestamp, event_data)
                 else:
                     logger.info(f"Ignoring duplicate event for {label} on {camera} camera.")
-                    logger.debug(f"Event Data: {event_data}")
+                    logger.debug("Event Data: %s", event_data)
             else:
                 logger.info(f"Ignoring {label} on {camera} camera during cooldown period.")
-                logger.debug(f"Event Data: {event_data}")
+                logger.debug("Event Data: %s", event_data)
         else:
             logger.info(f"Ignored {label} on {camera} camera due to empty entered_zones.")
-            logger.debug(f"Event Data: {event_data}")
+            logger.debug("Event Data: %s", event_data)
                         
     # Handling the end event
     elif event_type == "end":
         with processed_events_lock:
             if event_id in processed_events:
                 logger.info(f"Sending end event for {label} on {camera} camera.")
-                logger.debug(f"Event Data: {event_data}")
+                logger.debug("Event Data: %s", event_data)
 
                 # Remove the event ID from processed events
                 del processed_events[event_id]
 
 
-# Load config from YAML
-config = load_config()
+def get_pipeline_health():
+    """Summarize pipeline health from in-memory state only (no database or template work).
+
+    Returns (live, ready, detail): live is False when the MQTT loop has failed,
+    ready is False when MQTT is not connected or the pipeline has stalled.
+    """
+    now = time.monotonic()
+    with mqtt_state_lock:
+        state = mqtt_connection_state
+    with health_lock:
+        message_time = last_message_time
+        pushover_success = last_pushover_success
+        queue_depth = len(outbound_pending)
+        oldest_send = min(outbound_pending.values(), default=None)
+        handler_start = handler_started
+
+    with startup_lock:
+        timings = dict(startup_timings)
+
+    message_age = now - message_time if message_time is not None else None
+    oldest_send_age = now - oldest_send if oldest_send is not None else None
+    handler_age = now - handler_start if handler_start is not None else None
+
+    problems = []
+    live = state != MQTTConnectionState.FAILED
+    if not live:
+        problems.append("MQTT connection failed")
+    elif state != MQTTConnectionState.CONNECTED:
+        problems.append(f"MQTT {state.value}")
+    max_message_age = health_config.get('max_message_age', 0)
+    quiet_for = message_age if message_age is not None else now - startup_started
+    if max_message_age and state == MQTTConnectionState.CONNECTED and quiet_for > max_message_age:
+        problems.append(f"no MQTT message for more than {max_message_age}s")
+    max_handler_time = health_config.get('max_handler_time', 30)
+    if max_handler_time and handler_age is not None and handler_age > max_handler_time:
+        problems.append(f"MQTT message handler running for more than {max_handler_time}s")
+    max_notification_age = health_config.get('max_notification_age', 45)
+    if oldest_send_age is not None and oldest_send_age > max_notification_age:
+        problems.append(f"notification pending for more than {max_notification_age}s")
+
+    detail = {
+        "mqtt_state": state.value,
+        "last_message_age": round(message_age, 1) if message_age is not None else None,
+        "outbound_queue_depth": queue_depth,
+        "oldest_outbound_age": round(oldest_send_age, 1) if oldest_send_age is not None else None,
+        "handler_running_for": round(handler_age, 1) if handler_age is not None else None,
+        "last_pushover_success": datetime.datetime.fromtimestamp(pushover_success).isoformat() if pushover_success else None,
+        "leader": is_leader(),
+        "startup": {phase: round(seconds, 3) for phase, seconds in timings.items()},
+        "problems": problems,
+    }
+    return live, not problems, detail
+
+def configure(loaded_config):
+    """Apply a validated configuration to the module settings"""
+    global config, mqtt_config, pushover_config, frigate_server_config, web_server_config
+    global cooldown_period, alert_policies, policy_zones, log_info, healthchecks_config
+    global silence_db, cameras, doors, doors_by_topic, door_debounce, silence_flush_interval
+    global frigate_server, web_server, health_config
+    global ha_config, ha_enabled, instance_id, ha_lease_topic, ha_state_topic
+    global ha_lease_duration, ha_renew_interval, mqtt_client_id
+
+    config = loaded_config
+
+    # Accessing specific settings from the configuration
+    mqtt_config = config['mqtt']
+    pushover_config = config['pushover']
+    frigate_server_config = config['frigate_server']
+    web_server_config = config['web_server']
+    cooldown_period = config['cooldown_period']
+    alert_policies, policy_zones = compile_alert_policies(config.get('alert_policies'))
+    resolve_alert_policy.cache_clear()
+    log_info = config['log_info']
+    healthchecks_config = config['healthchecks']
+    silence_db = config['database']
+    cameras = config['cameras']
+    doors = config['door_settings']['doors']
+    doors_by_topic = {door['topic']: door for door in doors}
+    door_debounce = config['door_settings'].get('debounce', 5)  # Seconds
+    silence_flush_interval = config['door_settings'].get('flush_interval', 5)  # Seconds
+    frigate_server = frigate_server_config['host']
+    web_server = web_server_config['url']
+    health_config = config.get('health', {})
+
+    # High availability (optional active/standby mode)
+    ha_config = config.get('high_availability', {})
+    ha_enabled = ha_config.get('enabled', False)
+    instance_id = str(ha_config.get('instance_id') or os.getenv('HOSTNAME') or socket.gethostname())
+    ha_lease_topic = ha_config.get('lease_topic', 'frigate_notify/ha/lease')
+    ha_state_topic = ha_config.get('state_topic', 'frigate_notify/ha/state')
+    ha_lease_duration = ha_config.get('lease_duration', 10)  # Seconds without renewal before a standby takes over
+    ha_renew_interval = ha_config.get('renew_interval', 2)  # Seconds between lease renewals/claims
+    mqtt_client_id = f"frigate-notify-{instance_id}" if ha_enabled else "frigate-notify"
+
+class JsonLogFormatter(logging.Formatter):
+    """Format log records as one JSON object per line for log ingestion"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records without formatting them, so message formatting happens on the writer thread"""
+
+    def prepare(self, record):
+        return record
+
+def compress_rotated_log(source, dest):
+    """Rotator for rotating file handlers: gzip the rotated file"""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+def create_log_file_handler(log_file_path, rotation):
+    """Create a size- or time-based rotating handler for the log file"""
+    backup_count = rotation.get('backup_count', 5)
+    if rotation.get('when'):
+        handler = logging.handlers.TimedRotatingFileHandler(
+            log_file_path, when=rotation['when'], backupCount=backup_count
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            log_file_path, maxBytes=rotation.get('max_bytes', 10 * 1024 * 1024), backupCount=backup_count
+        )
+    if rotation.get('compress', True):
+        handler.namer = lambda name: f"{name}.gz"
+        handler.rotator = compress_rotated_log
+    return handler
+
+def setup_logging(log_info):
+    """Route all logging through a queue to a background writer with file and screen handlers"""
+    logging_level = log_info['level']
+    log_file_path = log_info['log_file']
+    log_to_screen = log_info['log_to_screen']
+    valid_logging_levels = ['CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG', 'NOTSET']
+
+    if logging_level not in valid_logging_levels:
+        print(f"Invalid logging level specified: {logging_level}. Exiting.")
+        exit(1)
+
+    # Check if Log File is Writable
+    try:
+        with open(log_file_path, 'a') as f:
+            pass
+    except IOError as e:
+        print(f"Could not open log file {log_file_path} for writing. Exiting.")
+        exit(1)
 
-# Accessing specific settings from the configuration
-mqtt_config = config['mqtt']
-pushover_config = config['pushover']
-frigate_server_config = config['frigate_server']
-web_server_config = config['web_server']
-cooldown_period = config['cooldown_period']
-log_info = config['log_info']
-healthchecks_config = config['healthchecks']
-silence_db = config['database']
-cameras = config['cameras']
-doors = config['door_settings']['doors']
+    if log_info.get('format', 'text') == 'json':
+        formatter = JsonLogFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+
+    # Setup Log File Handle
+    handlers = [create_log_file_handler(log_file_path, log_info.get('rotation', {}))]
+
+    # Setup Screen logging
+    if log_to_screen:
+        handlers.append(logging.StreamHandler())
+
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # Callers only enqueue records; the listener thread formats and writes them
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)  # Registered before exit_handler so its message is still written
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging_level)
+    root_logger.addHandler(DeferredQueueHandler(log_queue))
+
+    # Per-logger levels, e.g. to quiet paho.mqtt.client or werkzeug. Access logs
+    # (including health probes) stay out of the log file unless werkzeug is configured.
+    logger_levels = {'werkzeug': 'WARNING', **(log_info.get('loggers') or {})}
+    for name, level in logger_levels.items():
+        logging.getLogger(name).setLevel(level)
+
+def record_startup_phase(phase):
+    """Record and log the time from process start to a startup phase (first occurrence only)"""
+    with startup_lock:
+        if phase in startup_timings:
+            return
+        startup_timings[phase] = time.monotonic() - startup_started
+    if logging.getLogger().handlers:  # Before setup_logging() the phase is logged by log_startup_phases()
+        log_startup_phases()
+
+def log_startup_phases():
+    """Log the startup phases recorded so far that have not been logged yet"""
+    with startup_lock:
+        unlogged = [(phase, elapsed) for phase, elapsed in startup_timings.items() if phase not in startup_logged]
+        startup_logged.update(phase for phase, _ in unlogged)
+    for phase, elapsed in unlogged:
+        logger.info(f"Startup: {phase} after {elapsed:.3f}s")
+
+# Settings, populated by configure()
+config = None
+mqtt_config = pushover_config = frigate_server_config = web_server_config = None
+cooldown_period = 60
+alert_policies, policy_zones = {}, set()
+log_info = healthchecks_config = None
+silence_db = None
+cameras = []
+doors = []
+doors_by_topic = {}
+door_debounce = 5
+silence_flush_interval = 5
+frigate_server = web_server = None
+health_config = {}
+ha_config = {}
+ha_enabled = False
+instance_id = None
+ha_lease_topic = ha_state_topic = None
+ha_lease_duration = 10
+ha_renew_interval = 2
+mqtt_client_id = "frigate-notify"
 
 processed_events = {}  # Changed to dict with timestamps: {event_id: timestamp}
 last_ping_time = None
 cooldown_dict = {}  # Initialize the cooldown dictionary
+rate_limit_buckets = {}  # Token buckets per alert key: {key: (tokens, last_refill)}
 detection_dict = {} # Intiialize the detection dictionary
-frigate_server = frigate_server_config['host']
-web_server = web_server_config['url']
 mqtt_connection_state = MQTTConnectionState.DISCONNECTED  # Track MQTT connection state
+mqtt_client = None  # Current MQTT client, used to publish HA lease and state messages
+lease_holder = None  # Instance ID currently holding the leader lease
+lease_term = 0  # Term of the current lease, incremented by each successful claim
+lease_sent = 0.0  # Publisher wall-clock time of the holder's latest accepted claim/renewal
+lease_observe_until = 0.0  # Monotonic time until which this instance only observes the lease topic
+door_states = {}  # Per door topic: {topic: {"payload": last payload, "triggered": monotonic time of last trigger}}
+pending_silences = {}  # Door silences not yet written to the database: {camera_id: silence_until}
+last_message_time = None  # Monotonic time of the last MQTT message received
+handler_started = None  # Monotonic start of the on_message call in progress, None when idle
+last_pushover_success = None  # Wall-clock time of the last successful Pushover send
+outbound_queue = queue.Queue()  # Outbound tasks for process_outbound_queue: (task_id, task, args)
+outbound_pending = {}  # Queued or running outbound tasks: {task_id: monotonic time queued}
+startup_timings = {}  # Seconds from process start to each startup phase: {phase: seconds}
+startup_logged = set()  # Startup phases already logged
 
 # Thread safety locks for shared data structures
 mqtt_state_lock = threading.Lock()  # Lock for MQTT state changes
 processed_events_lock = threading.Lock()  # Lock for processed_events dict
 cooldown_lock = threading.Lock()  # Lock for cooldown_dict
 detection_lock = threading.Lock()  # Lock for detection_dict
+rate_limit_lock = threading.Lock()  # Lock for rate_limit_buckets
+ha_lock = threading.Lock()  # Lock for leader lease state
+door_lock = threading.Lock()  # Lock for door_states
+silence_lock = threading.RLock()  # Lock for pending_silences, held across the database write that supersedes them
+startup_lock = threading.Lock()  # Lock for startup_timings and startup_logged
+health_lock = threading.Lock()  # Lock for last_pushover_success, outbound_pending and handler_started
+
+# Handlers are attached by setup_logging()
+logger = logging.getLogger("frigatenotify")
+
+def create_app():
+    """Create the Flask app serving the web UI and Frigate proxy routes"""
+    import requests
+    from flask import Flask, request, jsonify, render_template, Response
 
-# Initialize Database
-initialize_db(silence_db)
-
-# Setup Logging
-logging_level = log_info['level']
-log_file_path = log_info['log_file']
-log_to_screen = log_info['log_to_screen']
-valid_logging_levels = ['CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG', 'NOTSET']
-
-if logging_level not in valid_logging_levels:
-    print(f"Invalid logging level specified: {logging_level}. Exiting.")
-    exit(1)
-
-# Check if Log File is Writable
-try:
-    with open(log_file_path, 'a') as f:
-        pass
-except IOError as e:
-    print(f"Could not open log file {log_file_path} for writing. Exiting.")
-    exit(1)
-
-# Initialize Logging
-logger = logging.getLogger(__name__)
-logger.setLevel(logging_level)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
-
-# Setup Log File Handle and add to the logger
-file_handler = logging.FileHandler(log_file_path)
-file_handler.setLevel(logging_level)
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
-
-# Setup Screen logging
-if log_to_screen:
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging_level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-
-atexit.register(exit_handler)
-logger.info("Starting Frigate Notify.")
-
-def main():
-    # Setup flask
     app = Flask(__name__)
 
+    @app.after_request
+    def record_first_ok_response(response):
+        if response.status_code == 200 and "first HTTP 200" not in startup_timings:
+            record_startup_phase("first HTTP 200")
+        return response
+
     # Setup the various routes to provide web services and proxy requests to the backend Frigate Server
     @app.route('/api/proxy/events/<event_id>/retain', methods=['DELETE'])
     def proxy_unretain_event(event_id):
@@ -720,6 +1491,16 @@ def main():
         else:
             return jsonify({"error": "Failed to fetch event information"}), response.status_code
     
+    @app.route('/healthz')
+    def healthz():
+        live, ready, detail = get_pipeline_health()
+        return jsonify({"status": "ok" if live else "failed", **detail}), 200 if live else 503
+
+    @app.route('/readyz')
+    def readyz():
+        live, ready, detail = get_pipeline_health()
+        return jsonify({"status": "ready" if ready else "not ready", **detail}), 200 if ready else 503
+
     @app.route('/silence_settings')
     def silence_settings():
         all_settings = get_silence_settings()
@@ -749,6 +1530,7 @@ def main():
         if 'all' in selected_cameras:
             for cam in config['cameras']:
                 set_silence_settings(cam, silence_until)
+                publish_silence_state(cam, silence_until)
             logger.info(f"Silence set for all cameras until {silence_until} (duration: {duration} minutes) from {request.remote_addr}")
         else:
             # Validate camera IDs
@@ -758,6 +1540,7 @@ def main():
 
             for camera in selected_cameras:
                 set_silence_settings(camera, silence_until)
+                publish_silence_state(camera, silence_until)
             logger.info(f"Silence set for cameras {selected_cameras} until {silence_until} (duration: {duration} minutes) from {request.remote_addr}")
 
         return jsonify({"status": "success", "message": "Silence settings updated successfully"})
@@ -768,26 +1551,63 @@ def main():
             return jsonify({"status": "error", "message": f"Invalid camera ID: {camera_id}"}), 400
 
         clear_silence_settings(camera_id)
+        publish_silence_state(camera_id, None)
         logger.info(f"Silence cleared for camera {camera_id} from {request.remote_addr}")
         return jsonify({"status": "success", "message": f"Silence settings cleared for {camera_id}"})
 
     @app.route('/clear_all_silence')
     def clear_all_silence():
         clear_silence_settings()
+        for cam in config['cameras']:
+            publish_silence_state(cam, None)
         logger.info(f"Silence cleared for all cameras from {request.remote_addr}")
         return jsonify({"status": "success", "message": f"Silence settings cleared for all cameras."})
 
+    return app
+
+def main(config_file='/config/config.yaml', port=5050):
+    configure(load_config(config_file))
+    record_startup_phase("config loaded")
+
+    setup_logging(log_info)
+    log_startup_phases()
+    atexit.register(exit_handler)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))  # Run exit_handler on container stop
+    logger.info("Starting Frigate Notify.")
+    if ha_enabled:
+        logger.info(f"High availability enabled, instance {instance_id} starting as standby.")
+    record_startup_phase("logging ready")
+
+    # Initialize Database
+    initialize_db(silence_db)
+    record_startup_phase("database ready")
 
-    # Start MQTT connection thread
+    # Start MQTT connection thread first so the broker connection overlaps web startup
     mqtt_thread = threading.Thread(target=connect_to_mqtt, daemon=True)
     mqtt_thread.start()
 
+    # Start outbound worker for notifications and healthcheck pings
+    outbound_thread = threading.Thread(target=process_outbound_queue, daemon=True)
+    outbound_thread.start()
+
     # Start cleanup thread for processed_events
     cleanup_thread = threading.Thread(target=cleanup_old_processed_events, daemon=True)
     cleanup_thread.start()
 
+    # Start flush thread for door silences
+    flush_thread = threading.Thread(target=flush_silences_periodically, daemon=True)
+    flush_thread.start()
+
+    # Start leader lease thread for active/standby mode
+    if ha_enabled:
+        lease_thread = threading.Thread(target=maintain_leader_lease, daemon=True)
+        lease_thread.start()
+
+    app = create_app()
+    record_startup_phase("web app created")
+
     # Start Flask app (this will block)
-    app.run(host='0.0.0.0', port=5050)
+    app.run(host='0.0.0.0', port=port)
 
 if __name__ == '__main__':
     main()
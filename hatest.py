@@ -0,0 +1,241 @@
+import argparse
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import requests
+import yaml
+
+# Failover test for high availability mode. Starts two Frigate Notify instances
+# against a local Mosquitto broker, waits for one to take the leader lease, sets
+# a silence on the leader, stops it and measures how long the standby takes to
+# lead. Then restarts the stopped instance with an empty database to check that
+# it receives the silence and joins as standby. Fails (exit code 1) whenever the
+# instances do not report exactly one leader.
+#
+#   python hatest.py                      # Starts mosquitto from PATH
+#   python hatest.py --broker 127.0.0.1:1883 --stop kill
+
+CAMERA = "Front"
+INSTANCES = ("notify-a", "notify-b")
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_broker(workdir):
+    """Start a throwaway Mosquitto listening on localhost, anonymous access allowed"""
+    binary = shutil.which('mosquitto')
+    if binary is None:
+        raise RuntimeError("mosquitto not found on PATH, install it or pass --broker host:port")
+    port = free_port()
+    conf = os.path.join(workdir, 'mosquitto.conf')
+    with open(conf, 'w') as f:
+        f.write(f"listener {port} 127.0.0.1\nallow_anonymous true\n")
+    process = subprocess.Popen([binary, '-c', conf], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process, '127.0.0.1', port
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("mosquitto did not start listening")
+
+def write_config(path, workdir, name, broker_host, broker_port, topic_prefix, lease_duration, renew_interval):
+    config = {
+        'mqtt': {'username': 'hatest', 'password': 'hatest', 'host': broker_host, 'port': broker_port,
+                 'topic': f"{topic_prefix}/events", 'alert_topic': f"{topic_prefix}/object_detected"},
+        'pushover': {'api_key': 'hatest', 'user_key': 'hatest'},
+        'healthchecks': {'uuid': 'hatest'},
+        'frigate_server': {'host': 'http://127.0.0.1:9'},
+        'web_server': {'url': 'http://127.0.0.1'},
+        'log_info': {'level': 'INFO', 'log_file': os.path.join(workdir, f'{name}.log'), 'log_to_screen': False},
+        'cameras': [CAMERA],
+        'cooldown_period': 60,
+        'database': os.path.join(workdir, f'{name}.db'),
+        'door_settings': {'silence_period': 60, 'no_detection_timeout': 60, 'doors': []},
+        'high_availability': {
+            'enabled': True,
+            'instance_id': name,
+            'lease_topic': f"{topic_prefix}/ha/lease",
+            'state_topic': f"{topic_prefix}/ha/state",
+            'lease_duration': lease_duration,
+            'renew_interval': renew_interval,
+        },
+    }
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f)
+
+class Instance:
+    def __init__(self, name, workdir, config_file):
+        self.name = name
+        self.workdir = workdir
+        self.config_file = config_file
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.process = None
+
+    def start(self, fresh_database=False):
+        if fresh_database:
+            database = os.path.join(self.workdir, f'{self.name}.db')
+            if os.path.exists(database):
+                os.remove(database)
+        with open(os.path.join(self.workdir, f'{self.name}.err'), 'a') as err:
+            self.process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), '--serve', self.config_file, '--port', str(self.port)],
+                cwd=os.path.dirname(os.path.abspath(__file__)), stdout=err, stderr=subprocess.STDOUT,
+            )
+
+    def stop(self, how):
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.send_signal(signal.SIGKILL if how == 'kill' else signal.SIGTERM)
+        self.process.wait(timeout=15)
+
+    def health(self):
+        """The /healthz body, or None while the web server is down"""
+        if self.process is None or self.process.poll() is not None:
+            return None
+        try:
+            return requests.get(f"{self.url}/healthz", timeout=1).json()
+        except (requests.RequestException, ValueError):
+            return None
+
+    def silenced(self):
+        try:
+            return requests.get(f"{self.url}/get_camera_silence_settings", timeout=1).json().get(CAMERA) is not None
+        except (requests.RequestException, ValueError):
+            return False
+
+def leaders(instances):
+    return [instance.name for instance in instances if (instance.health() or {}).get('leader')]
+
+def wait_for(condition, timeout, interval=0.1):
+    """Poll until condition() returns a truthy value; returns (value, seconds waited)"""
+    started = time.time()
+    while time.time() - started < timeout:
+        value = condition()
+        if value:
+            return value, time.time() - started
+        time.sleep(interval)
+    return None, time.time() - started
+
+def run_failover(instances, args, check):
+    # Leadership changes take at most one lease for observation, one for expiry and a renewal
+    takeover_timeout = 2 * args.lease_duration + args.renew_interval + 10
+
+    elected, waited = wait_for(lambda: leaders(instances), takeover_timeout)
+    check(elected is not None and len(elected) == 1, f"one leader elected after {waited:.1f}s: {elected}")
+    if not elected:
+        return
+    leader = next(instance for instance in instances if instance.name == elected[0])
+    standby = next(instance for instance in instances if instance is not leader)
+
+    response = requests.post(f"{leader.url}/set_silence", data={"duration": "10", "camera[]": CAMERA}, timeout=5)
+    check(response.ok, f"silence set on leader {leader.name}")
+    _, waited = wait_for(standby.silenced, 10)
+    check(standby.silenced(), f"silence replicated to standby {standby.name} after {waited:.1f}s")
+
+    print(f"Stopping leader {leader.name} with SIG{args.stop.upper()}")
+    leader.stop(args.stop)
+    stopped_at = time.time()
+    overlap = []
+
+    def standby_leads():
+        current = leaders(instances)
+        if len(current) > 1:
+            overlap.append(current)
+        return current == [standby.name]
+
+    taken_over, _ = wait_for(standby_leads, takeover_timeout)
+    check(taken_over is not None, f"standby {standby.name} took over after {time.time() - stopped_at:.1f}s")
+    check(not overlap, f"never more than one leader during takeover{f': {overlap}' if overlap else ''}")
+
+    print(f"Restarting {leader.name} with an empty database")
+    leader.start(fresh_database=True)
+    wait_for(leader.health, 30)
+    _, waited = wait_for(leader.silenced, 10)
+    check(leader.silenced(), f"rejoined {leader.name} received the silence after {waited:.1f}s")
+    time.sleep(args.lease_duration + args.renew_interval)  # Past the rejoined instance's observation window
+    current = leaders(instances)
+    check(current == [standby.name], f"exactly one leader after rejoin: {current}")
+
+def serve(config_file, port):
+    """Subprocess entry point: run a full Frigate Notify instance on its own port"""
+    import frigatenotify
+
+    frigatenotify.main(config_file, port)
+
+def main():
+    parser = argparse.ArgumentParser(description="Failover test for Frigate Notify high availability mode")
+    parser.add_argument('--broker', help="Use an existing broker at host:port instead of starting mosquitto")
+    parser.add_argument('--stop', choices=('term', 'kill'), default='term',
+                        help="Stop the leader with SIGTERM (clean release) or SIGKILL (lease expiry)")
+    parser.add_argument('--lease-duration', type=int, default=4, help="high_availability.lease_duration")
+    parser.add_argument('--renew-interval', type=int, default=1, help="high_availability.renew_interval")
+    parser.add_argument('--serve', metavar='CONFIG', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    failures = []
+
+    def check(ok, message):
+        print(f"{'PASS' if ok else 'FAIL'}  {message}")
+        if not ok:
+            failures.append(message)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        broker = None
+        if args.broker:
+            broker_host, broker_port = args.broker.rsplit(':', 1)
+            broker_port = int(broker_port)
+        else:
+            broker, broker_host, broker_port = start_broker(workdir)
+
+        topic_prefix = f"hatest/{uuid.uuid4().hex[:8]}"  # Keeps retained messages from earlier runs out of this one
+        instances = []
+        for name in INSTANCES:
+            config_file = os.path.join(workdir, f'{name}.yaml')
+            write_config(config_file, workdir, name, broker_host, broker_port, topic_prefix,
+                         args.lease_duration, args.renew_interval)
+            instances.append(Instance(name, workdir, config_file))
+
+        try:
+            for instance in instances:
+                instance.start()
+            run_failover(instances, args, check)
+        finally:
+            for instance in instances:
+                instance.stop('term')
+            if broker is not None:
+                broker.terminate()
+                broker.wait(timeout=10)
+
+        if failures:
+            for instance in instances:
+                for suffix in ('err', 'log'):
+                    path = os.path.join(workdir, f'{instance.name}.{suffix}')
+                    if os.path.exists(path):
+                        with open(path) as f:
+                            print(f"--- last lines of {instance.name}.{suffix} ---")
+                            print(''.join(f.readlines()[-20:]), end='')
+
+    print(f"{'FAILED' if failures else 'PASSED'}: lease_duration {args.lease_duration}s, "
+          f"renew_interval {args.renew_interval}s, leader stopped with SIG{args.stop.upper()}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
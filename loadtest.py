@@ -0,0 +1,304 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import requests
+import yaml
+
+# Load test for the web tier. Runs Frigate Notify in a subprocess against a stub
+# Frigate server (synthetic JPEGs and MP4s) and a stub Pushover API, drives each
+# route with concurrent clients, and reports throughput, latency percentiles and
+# peak RSS. Synthetic alerts are injected into the MQTT message handler at the
+# same time to measure end-to-end alert latency under web load.
+#
+#   python loadtest.py --concurrency 8 --duration 10
+
+EVENT_ID = "1700000000.000000-loadtest"
+ALERT_CAMERA = "Loadtest"  # Alerts are injected here, /set_silence targets another camera
+SILENCE_CAMERA = "Front"
+
+SCENARIOS = [
+    # (name, method, path, form data)
+    ("idle (alerts only)", None, None, None),
+    ("serve_event_page", "GET", f"/event/{EVENT_ID}", None),
+    ("proxy_snapshot", "GET", f"/api/events/{EVENT_ID}/snapshot.jpg", None),
+    ("proxy_clip", "GET", f"/api/events/{EVENT_ID}/clip.mp4", None),
+    ("get_camera_silence_settings", "GET", "/get_camera_silence_settings", None),
+    ("set_silence", "POST", "/set_silence", {"duration": "1", "camera[]": SILENCE_CAMERA}),
+]
+
+class StubServer:
+    """Stub Frigate API serving synthetic media, plus a stub Pushover API recording alert latency"""
+
+    def __init__(self, snapshot_kb, clip_mb, seed=0):
+        rng = random.Random(seed)
+        self.snapshot = b'\xff\xd8\xff\xe0' + rng.randbytes(snapshot_kb * 1024) + b'\xff\xd9'
+        self.clip = b'\x00\x00\x00\x18ftypmp42' + rng.randbytes(clip_mb * 1024 * 1024)
+        self.alerts = []  # (received_at, latency_seconds)
+        self.alerts_lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path.endswith('/snapshot.jpg') or self.path.endswith('/thumbnail.jpg'):
+                    self._send(stub.snapshot, 'image/jpeg')
+                elif self.path.endswith('/clip.mp4'):
+                    self._send(stub.clip, 'video/mp4')
+                elif re.match(r'^/api/events/[\w.\-]+$', self.path):
+                    self._send(json.dumps({"id": self.path.rsplit('/', 1)[-1]}).encode(), 'application/json')
+                else:
+                    self._send(b'{}', 'application/json', status=404)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                match = re.search(rb'/event/(\d+\.\d+)-loadtest', body)
+                if match:
+                    received_at = time.time()
+                    with stub.alerts_lock:
+                        stub.alerts.append((received_at, received_at - float(match.group(1))))
+                self._send(b'{"status": 1}', 'application/json')
+
+            def _send(self, body, content_type, status=200):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def alert_latencies(self, start, end):
+        with self.alerts_lock:
+            return [latency for received_at, latency in self.alerts if start <= received_at < end]
+
+class RssSampler:
+    """Sample the resident set size of a process from /proc (Linux only)"""
+
+    def __init__(self, pid, interval=0.1):
+        self.path = f"/proc/{pid}/status"
+        self.interval = interval
+        self.samples = []  # (time, rss_kb)
+        self.available = os.path.exists(self.path)
+
+    def start(self):
+        if self.available:
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                with open(self.path) as f:
+                    for line in f:
+                        if line.startswith('VmRSS:'):
+                            self.samples.append((time.time(), int(line.split()[1])))
+                            break
+            except OSError:
+                return  # Process exited
+            time.sleep(self.interval)
+
+    def peak_kb(self, start, end):
+        values = [rss for sampled_at, rss in self.samples if start <= sampled_at < end]
+        return max(values, default=None)
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def write_config(path, stub_url, workdir):
+    config = {
+        'mqtt': {'username': 'loadtest', 'password': 'loadtest', 'host': '127.0.0.1', 'port': 1883,
+                 'topic': 'frigate/events', 'alert_topic': 'frigate_notify/object_detected'},
+        'pushover': {'api_key': 'loadtest', 'user_key': 'loadtest', 'api_url': f"{stub_url}/1/messages.json"},
+        'healthchecks': {'uuid': 'loadtest'},
+        'frigate_server': {'host': stub_url},
+        'web_server': {'url': 'http://127.0.0.1'},
+        'log_info': {'level': 'INFO', 'log_file': os.path.join(workdir, 'frigatenotify.log'), 'log_to_screen': False,
+                     'loggers': {'werkzeug': 'WARNING'}},
+        'cameras': [SILENCE_CAMERA, ALERT_CAMERA],
+        'cooldown_period': 0,
+        'database': os.path.join(workdir, 'silence_settings.db'),
+        'door_settings': {'silence_period': 2, 'no_detection_timeout': 2, 'doors': []},
+    }
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f)
+
+def inject_alerts(frigatenotify, interval):
+    """Feed synthetic Frigate events to the MQTT handler; the event ID carries the send time"""
+    topic = frigatenotify.mqtt_config['topic']
+    while True:
+        event = {
+            "type": "new",
+            "after": {"id": f"{time.time():.6f}-loadtest", "label": "person", "camera": ALERT_CAMERA,
+                      "entered_zones": ["loadtest"], "top_score": 0.9},
+        }
+        frigatenotify.on_message(None, None, SimpleNamespace(topic=topic, payload=json.dumps(event).encode()))
+        time.sleep(interval)
+
+def serve(config_file, port, alert_interval):
+    """Subprocess entry point: run the web tier and the alert injector"""
+    import frigatenotify
+
+    frigatenotify.configure(frigatenotify.load_config(config_file))
+    frigatenotify.setup_logging(frigatenotify.log_info)
+    frigatenotify.initialize_db(frigatenotify.silence_db)
+    frigatenotify.last_ping_time = datetime.datetime.now()  # Keep healthchecks.io pings out of the measurement
+
+    threading.Thread(target=frigatenotify.process_outbound_queue, daemon=True).start()
+    if alert_interval > 0:
+        threading.Thread(target=inject_alerts, args=(frigatenotify, alert_interval), daemon=True).start()
+
+    frigatenotify.create_app().run(host='127.0.0.1', port=port)
+
+def run_scenario(base_url, method, path, data, concurrency, duration):
+    """Drive one route with concurrent clients for duration seconds"""
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        latencies, errors = [], 0
+        with requests.Session() as session:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = session.request(method, base_url + path, data=data, timeout=60)
+                    response.content  # Read the full body, clips included
+                    if response.status_code != 200:
+                        errors += 1
+                except requests.RequestException:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+        return latencies, errors
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = [future.result() for future in [pool.submit(worker) for _ in range(concurrency)]]
+
+    latencies = [latency for worker_latencies, _ in results for latency in worker_latencies]
+    return latencies, sum(errors for _, errors in results)
+
+def wait_until_healthy(base_url, process, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Frigate Notify exited with code {process.returncode}")
+        try:
+            if requests.get(f"{base_url}/healthz", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Frigate Notify did not become healthy")
+
+def format_ms(seconds):
+    return f"{seconds * 1000:.1f}" if seconds is not None else "-"
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Frigate Notify web tier")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent clients per scenario")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds per scenario")
+    parser.add_argument('--port', type=int, default=5051, help="Port for the Frigate Notify web server")
+    parser.add_argument('--snapshot-kb', type=int, default=200, help="Size of synthetic snapshots")
+    parser.add_argument('--clip-mb', type=int, default=5, help="Size of synthetic clips")
+    parser.add_argument('--alert-interval', type=float, default=0.5, help="Seconds between injected alerts (0 disables)")
+    parser.add_argument('--output', help="Also write results as JSON to this file")
+    parser.add_argument('--serve', metavar='CONFIG', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.alert_interval)
+        return
+
+    stub = StubServer(args.snapshot_kb, args.clip_mb)
+    stub.start()
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    with tempfile.TemporaryDirectory() as workdir:
+        config_file = os.path.join(workdir, 'config.yaml')
+        write_config(config_file, stub.url, workdir)
+        with open(os.path.join(workdir, 'server.err'), 'w') as server_err:
+            process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), '--serve', config_file,
+                 '--port', str(args.port), '--alert-interval', str(args.alert_interval)],
+                cwd=os.path.dirname(os.path.abspath(__file__)), stdout=subprocess.DEVNULL, stderr=server_err,
+            )
+            try:
+                wait_until_healthy(base_url, process)
+                sampler = RssSampler(process.pid)
+                sampler.start()
+
+                results = []
+                print(f"{'Scenario':<30}{'Reqs':>7}{'Errs':>6}{'Req/s':>9}{'p50':>8}{'p90':>8}{'p99':>8}{'Max':>8}"
+                      f"{'Alerts':>8}{'Alert p50':>11}{'Alert p99':>11}{'Peak RSS':>10}")
+                for name, method, path, data in SCENARIOS:
+                    started = time.time()
+                    if method is None:
+                        time.sleep(args.duration)
+                        latencies, errors = [], 0
+                    else:
+                        latencies, errors = run_scenario(base_url, method, path, data, args.concurrency, args.duration)
+                    ended = time.time()
+
+                    alert_latencies = stub.alert_latencies(started, ended)
+                    peak_rss_kb = sampler.peak_kb(started, ended)
+                    result = {
+                        "scenario": name,
+                        "requests": len(latencies),
+                        "errors": errors,
+                        "throughput": len(latencies) / (ended - started),
+                        "latency": {f"p{pct}": percentile(latencies, pct) for pct in (50, 90, 99)},
+                        "max_latency": max(latencies, default=None),
+                        "alerts": len(alert_latencies),
+                        "alert_latency": {f"p{pct}": percentile(alert_latencies, pct) for pct in (50, 99)},
+                        "peak_rss_kb": peak_rss_kb,
+                    }
+                    results.append(result)
+                    print(f"{name:<30}{result['requests']:>7}{errors:>6}{result['throughput']:>9.1f}"
+                          f"{format_ms(result['latency']['p50']):>8}{format_ms(result['latency']['p90']):>8}"
+                          f"{format_ms(result['latency']['p99']):>8}{format_ms(result['max_latency']):>8}"
+                          f"{len(alert_latencies):>8}{format_ms(result['alert_latency']['p50']):>11}"
+                          f"{format_ms(result['alert_latency']['p99']):>11}"
+                          f"{(f'{peak_rss_kb / 1024:.1f}M' if peak_rss_kb else '-'):>10}")
+            finally:
+                process.terminate()
+                process.wait(timeout=10)
+
+        # High-water mark over the whole run, available once the subprocess has been waited on
+        peak_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        if sys.platform == 'darwin':
+            peak_kb //= 1024  # Reported in bytes on macOS
+        print(f"Latencies in ms, concurrency {args.concurrency}, {args.duration:g}s per scenario. "
+              f"Server peak RSS over the run: {peak_kb / 1024:.1f}M")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"concurrency": args.concurrency, "duration": args.duration,
+                       "peak_rss_kb": peak_kb, "scenarios": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()